@@ -10,59 +10,333 @@ Usage: python ogg-batch-download-convert.py [target_url] <output_directory> <alb
 import os
 import sys
 import time
+import random
+import json
+import logging
+import shutil
+import subprocess
 import requests
-import music_tag
 from bs4 import BeautifulSoup
-from urllib.parse import unquote
-from pydub import AudioSegment
+from requests.adapters import HTTPAdapter
+from urllib.parse import unquote, urlparse
+from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError
+from threading import Condition, Lock, Semaphore
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36",}
 
+# Shared session so requests to the same host reuse pooled keep-alive connections
+SESSION = requests.Session()
+SESSION.headers.update(headers)
+SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=0))
+SESSION.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=0))
+
+# Request timeouts as (connect, read) in seconds; file downloads allow slower bodies
+REQUEST_TIMEOUT = (5, 30)
+DOWNLOAD_TIMEOUT = (5, 60)
+
+# Buffer size for streaming file downloads
+CHUNK_SIZE = 1 << 20
+
+# Bytes read from the start of a stream to identify its audio codec
+PROBE_SIZE = 1 << 16
+
+# Transient request failures which are worth retrying; other errors fail immediately
+# Streamed bodies are read from the raw urllib3 response, so its errors are included
+RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.exceptions.ChunkedEncodingError,
+                    ProtocolError, ReadTimeoutError)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Consecutive transient failures to a host before its requests are paused, and for how long in seconds.
+# Kept below one item's retry attempts so that a single failing item also backs off through the breaker.
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_RESET_TIMEOUT = 30
+
+# Concurrency limits; single-threaded encodes scale with cores, while open connections to the origin server
+# are capped separately to avoid throttling. Encodes stream their download, so each one also holds a
+# connection slot and at most MAX_CONCURRENT_REQUESTS of them run at once. Spare workers wait on subpages.
+MAX_CONCURRENT_ENCODES = min(os.cpu_count() or 1, 8)
+MAX_CONCURRENT_REQUESTS = 5
+MAX_WORKERS = MAX_CONCURRENT_ENCODES + MAX_CONCURRENT_REQUESTS
+encode_semaphore = Semaphore(MAX_CONCURRENT_ENCODES)
+request_semaphore = Semaphore(MAX_CONCURRENT_REQUESTS)
+
+# Serialize access to the set of output files across worker threads
+existing_files_lock = Lock()
+
+# Circuit breakers keyed by host
+circuit_breakers = {}
+circuit_breakers_lock = Lock()
+
+# Resolved ogg URLs keyed by subpage URL, kept between runs so resumed batches skip subpage requests
+OGG_URL_CACHE_FILE = 'ogg_url_cache.json'
+ogg_url_cache = {}
+ogg_url_cache_lock = Lock()
+
+class DownloadError(Exception):
+    """Raised when a request fails with a status which is not worth retrying"""
+
+    def __init__(self, status_code, url):
+        """Create the error for a failed request
+        :param status_code: HTTP status code of the response
+        :param url: URL which was requested
+        """
+        super().__init__(f"HTTP {status_code} for {url}")
+        self.status_code = status_code
+        self.url = url
+
+class CircuitBreaker:
+    """Pause requests to a host once it has failed repeatedly, rather than letting every worker keep retrying it.
+    CLOSED passes requests through and counts consecutive failures, tripping to OPEN at the threshold.
+    OPEN holds requests back until the reset timeout elapses, then moves to HALF_OPEN.
+    HALF_OPEN lets a single trial request through; a success closes the breaker, a failure reopens it.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_TIMEOUT):
+        """Create a closed circuit breaker
+        :param failure_threshold: Consecutive failures after which the breaker opens
+        :param reset_timeout: Seconds to stay open before allowing a trial request
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failure_count = 0
+        self.opened_at = 0
+        self._condition = Condition()
+
+    def before_request(self):
+        """Wait until a request may proceed: immediately while closed, or as the trial once the reset timeout
+        has elapsed. Other requests wait for the trial's outcome.
+        """
+        with self._condition:
+            while True:
+                if self.state == self.CLOSED:
+                    return
+                if self.state == self.OPEN:
+                    time_remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+                    if time_remaining <= 0:
+                        self.state = self.HALF_OPEN
+                        return
+                    self._condition.wait(time_remaining)
+                else:
+                    self._condition.wait()
+
+    def record_success(self):
+        """Close the breaker following a successful request"""
+        with self._condition:
+            self.state = self.CLOSED
+            self.failure_count = 0
+            self._condition.notify_all()
+
+    def record_failure(self):
+        """Count a failed request, opening the breaker if the threshold is reached or a trial failed"""
+        with self._condition:
+            self.failure_count += 1
+            if self.state == self.CLOSED and self.failure_count >= self.failure_threshold:
+                print(f"Repeated request failures. Pausing requests for {self.reset_timeout} seconds...")
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failure_count >= self.failure_threshold):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._condition.notify_all()
+
+    def release_trial(self):
+        """Allow a new trial after one ended without a verdict on the host, e.g. on an invalid URL"""
+        with self._condition:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic() - self.reset_timeout
+                self._condition.notify_all()
+
+def get_circuit_breaker(url):
+    """Fetch the circuit breaker for a URL's host, creating it if necessary
+    :param url: URL whose host the breaker guards
+    :return: The CircuitBreaker shared by all requests to that host
+    """
+    host = urlparse(url).netloc
+    with circuit_breakers_lock:
+        if host not in circuit_breakers:
+            circuit_breakers[host] = CircuitBreaker()
+        return circuit_breakers[host]
+
+def guarded_get(url, **kwargs):
+    """Perform a GET request through the circuit breaker for the URL's host
+    :param url: URL to request
+    :param kwargs: Additional arguments passed on to the session's get
+    :return: The requests response
+    """
+    breaker = get_circuit_breaker(url)
+    breaker.before_request()
+    try:
+        response = SESSION.get(url, **kwargs)
+    except RETRY_EXCEPTIONS:
+        breaker.record_failure()
+        raise
+    except BaseException:
+        breaker.release_trial()
+        raise
+    if response.status_code in RETRY_STATUS_CODES:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+def retry(fn, *, max_attempts=5, base=0.25, cap=30):
+    """Call a request function, retrying transient failures with exponential backoff and full jitter
+    :param fn: Callable performing a request and returning its response
+    :param max_attempts: Maximum number of calls to make
+    :param base: Backoff delay ceiling in seconds before the first retry
+    :param cap: Upper bound in seconds on any single backoff delay
+    :return: The first response with a non-retryable status, or None if all attempts failed
+    """
+    for attempt in range(max_attempts):
+        try:
+            response = fn()
+            if response.status_code not in RETRY_STATUS_CODES:
+                return response
+            print(f"Server responded with status {response.status_code}")
+        except RETRY_EXCEPTIONS as e:
+            print(f"An error occurred fetching data: {e}")
+        attempts_remaining = max_attempts - attempt - 1
+        if attempts_remaining > 0:
+            print(f"Retrying... ({attempts_remaining} of {max_attempts} attempts remaining)")
+            time.sleep(random.uniform(0, min(cap, base * 2 ** attempt)))
+    return None
+
 def get_file_page_response(file_link):
     """Perform a page request, retrying on connection error as necessary
     :param file_link: Subpage expected to contain an ogg file download link
-    :return: The requests response as fetched from the file link
+    :return: The requests response as fetched from the file link, or None on failure
     """
-    file_page_response = None
-    number_attempts = 10
-    for attempt in range(number_attempts):
-        try:
-            file_page_response = requests.get(file_link, headers=headers)
-            break
-        except Exception as e:
-            print(f"An error occurred fetching data: {e}")
-            print(f"Retrying... ({number_attempts - attempt - 1} of {number_attempts} attempts remaining)")
-            time.sleep(1)
-    return file_page_response
+    def fetch():
+        with request_semaphore:
+            return guarded_get(file_link, timeout=REQUEST_TIMEOUT)
+
+    return retry(fetch)
+
+def load_ogg_url_cache():
+    """Load the subpage to ogg URL resolutions saved by a previous run
+    :return: Dictionary of ogg URLs keyed by subpage URL, empty if none could be read
+    """
+    try:
+        with open(OGG_URL_CACHE_FILE, 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+def save_ogg_url_cache():
+    """Save the subpage to ogg URL resolutions for use by a later run"""
+    with ogg_url_cache_lock:
+        with open(OGG_URL_CACHE_FILE, 'w') as file:
+            json.dump(ogg_url_cache, file, indent=1)
 
-def convert_ogg_to_mp3(ogg_path, mp3_path):
-    """Convert an ogg file to an mp3 file
-    :param ogg_path: Path/filename of ogg file to convert
+def probe_audio_codec(data):
+    """Identify the codec of the first audio stream in a chunk of media data
+    :param data: Leading bytes of the media stream
+    :return: The codec name as reported by ffprobe, or None if it could not be determined
+    """
+    result = subprocess.run(["ffprobe", "-v", "error", "-select_streams", "a:0",
+                             "-show_entries", "stream=codec_name", "-of", "csv=p=0", "pipe:0"],
+                            input=data, capture_output=True)
+    codec = result.stdout.decode(errors='replace').strip()
+    return codec.splitlines()[0] if (result.returncode == 0 and codec) else None
+
+def validate_artwork(artwork_file):
+    """Check that ffmpeg can embed an image as mp3 cover art by muxing it with a moment of silence
+    :param artwork_file: Path/filename of the image to check
+    :return: True if the image can be embedded, otherwise False
+    """
+    try:
+        result = subprocess.run(["ffmpeg", "-loglevel", "error", "-f", "lavfi", "-i", "anullsrc", "-i", artwork_file,
+                                 "-map", "0:a", "-map", "1:v:0", "-c:v", "copy", "-disposition:v:0", "attached_pic",
+                                 "-t", "0.1", "-f", "mp3", "-"],
+                                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except OSError:
+        return False
+    return result.returncode == 0
+
+def build_metadata_args(album_name=None, artist_name=None, artwork_file=None):
+    """Build the ffmpeg arguments which apply the same metadata to every track of a batch
+    :param album_name: Album name to tag, if any
+    :param artist_name: Artist name to tag, if any
+    :param artwork_file: Path/filename of an image to embed as cover art, if any
+    :return: Tuple of additional ffmpeg input arguments and output arguments
+    """
+    # Drop any tags carried over from the source
+    input_args = []
+    output_args = ["-map_metadata", "-1"]
+    if artwork_file:
+        input_args += ["-i", artwork_file]
+        output_args += ["-map", "1:v:0", "-c:v", "copy", "-disposition:v:0", "attached_pic",
+                        "-metadata:s:v:0", "comment=Cover (front)", "-id3v2_version", "3"]
+    if album_name:
+        output_args += ["-metadata", f"album={album_name}"]
+    if artist_name:
+        output_args += ["-metadata", f"artist={artist_name}"]
+    return input_args, output_args
+
+def convert_ogg_to_mp3(ogg_stream, mp3_path, title=None, metadata_args=None):
+    """Convert an ogg stream to a tagged mp3 file, piping it into ffmpeg as it is read.
+    Audio which is already mp3 is remuxed without re-encoding.
+    The partial mp3 file is removed if conversion does not complete.
+    :param ogg_stream: File-like object from which the ogg data is read
     :param mp3_path: Path/filename of mp3 file to be created
+    :param title: Track title to tag, if any
+    :param metadata_args: Input and output ffmpeg arguments for the batch metadata, from build_metadata_args
+    :raises subprocess.CalledProcessError: If ffmpeg fails to convert the stream
     """
-    audio = AudioSegment.from_ogg(ogg_path)
-    audio.export(mp3_path, format="mp3")
+    # Probe the head of the stream to decide whether the audio needs encoding
+    stream_head = ogg_stream.read(PROBE_SIZE)
+    if probe_audio_codec(stream_head) == 'mp3':
+        codec_args = ["-c:a", "copy"]
+    else:
+        codec_args = ["-c:a", "libmp3lame", "-q:a", "5", "-threads", "1"]
 
-def download_and_convert_ogg(ogg_url, folder='output'):
-    """Download an ogg file given its url,
-    convert to mp3, and save it in output directory.
+    # Write the tags and artwork in the same pass
+    input_args, output_args = (metadata_args or ([], []))
+    command = ["ffmpeg", "-y", "-loglevel", "error", "-i", "pipe:0", *input_args,
+               "-map", "0:a:0", *codec_args, *output_args]
+    if title:
+        command += ["-metadata", f"title={title}"]
+    command.append(mp3_path)
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, bufsize=CHUNK_SIZE)
+    try:
+        with process.stdin:
+            process.stdin.write(stream_head)
+            shutil.copyfileobj(ogg_stream, process.stdin, length=CHUNK_SIZE)
+    except BrokenPipeError:
+        # ffmpeg stopped reading early; its return code reports why
+        pass
+    except BaseException:
+        process.kill()
+        process.wait()
+        if os.path.isfile(mp3_path):
+            os.remove(mp3_path)
+        raise
+    if process.wait() != 0:
+        if os.path.isfile(mp3_path):
+            os.remove(mp3_path)
+        raise subprocess.CalledProcessError(process.returncode, command)
+
+def download_and_convert_ogg(ogg_url, existing_files, folder='output', metadata_args=None):
+    """Download an ogg file given its url, converting
+    to mp3 and tagging it as it streams, and save it in output directory.
     Duplicates are deliberately skipped.
     :param ogg_url: The URL of the ogg file to download
+    :param existing_files: Set of file names already present or in progress in the output directory
     :param folder: The output directory to which the file should be downloaded
+    :param metadata_args: ffmpeg arguments for the metadata shared by all tracks; the title is added per track
+    :raises DownloadError: If the server refuses the download with a non-retryable status
     """
-    if not os.path.exists(folder):
-        os.makedirs(folder)
-
     # Remove URL-encoded characters
     filename = unquote(ogg_url.split('/')[-1])
 
     # Determine the appropriate filename for the downloadable and output
-    handle_as_mp3 = False
     local_filename_ogg = os.path.join(folder, filename).split('.ogg', 1)[0] + '.ogg'
     if filename.endswith('.mp3'):
-        handle_as_mp3 = True
-        with open('output_notes.txt', 'a') as file:
-                file.write("Was already mp3: " + local_filename_ogg + '\n')
+        logging.info("Was already mp3: %s", local_filename_ogg)
         local_filename_mp3 = os.path.join(folder, filename).split('.ogg', 1)[0] + '.mp3'
     else:
         local_filename_mp3 = local_filename_ogg.split('.ogg', 1)[0] + '.mp3'
@@ -70,48 +344,126 @@ def download_and_convert_ogg(ogg_url, folder='output'):
     ogg_file_basename = os.path.basename(local_filename_ogg)
     mp3_file_basename = os.path.basename(local_filename_mp3)
 
-    if os.path.isfile(local_filename_mp3):
+    # Claim the output name so that duplicate links are not downloaded concurrently
+    with existing_files_lock:
+        file_exists = mp3_file_basename in existing_files
+        existing_files.add(mp3_file_basename)
+
+    if file_exists:
         print(f"File {mp3_file_basename} already exists. Skipping...")
         return local_filename_mp3, True
-    else:
-        print(f"Downloading {ogg_file_basename}...")
 
-        # Download the ogg file, retrying on connection error as necessary
-        number_attempts = 10
-        for attempt in range(number_attempts):
-            try:
-                with requests.get(ogg_url, stream=True, headers=headers) as r:
-                    r.raise_for_status()
-                    with open(local_filename_ogg, 'wb') as f:
-                        for chunk in r.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                break
-            except Exception as e:
-                print(f"An error occurred fetching data: {e}")
-                if (number_attempts - attempt - 1) > 0:
-                    print(f"Retrying... ({number_attempts - attempt - 1} of {number_attempts} attempts remaining)")
-                    time.sleep(1)
-                else:
-                    sys.exit("Encountered connection error which could not be resolved.")
+    # Release the claim on any path which does not produce the file, so a later link may retry it
+    file_written = False
+    try:
+        print(f"Downloading {ogg_file_basename}...")
 
-        # Skip encoding if already mp3
-        if handle_as_mp3:
-            os.rename(local_filename_ogg, local_filename_mp3)
-            return local_filename_mp3, False
+        # Stream the ogg file straight into the mp3 encoder, retrying on connection error as necessary
+        # Files which are already mp3 are detected by the encoder and only remuxed to add tags
+        title = os.path.splitext(mp3_file_basename)[0]
 
-        print(f"Converting {ogg_file_basename} to {mp3_file_basename}...")
+        def download_and_convert():
+            # Hold both an encoder slot and a request slot for the whole stream, as its connection stays open
+            with encode_semaphore, request_semaphore:
+                with guarded_get(ogg_url, stream=True, timeout=DOWNLOAD_TIMEOUT) as r:
+                    if r.ok:
+                        r.raw.decode_content = True
+                        print(f"Converting {ogg_file_basename} to {mp3_file_basename}...")
+                        convert_ogg_to_mp3(r.raw, local_filename_mp3, title, metadata_args)
+                    return r
 
         # Attempt the mp3 encoding, and save a list of failed attempts
         try:
-            convert_ogg_to_mp3(local_filename_ogg, local_filename_mp3)
-            os.remove(local_filename_ogg)
-        except:
-            print(f"Conversion failed. Logging entry...")
-            with open('output_notes.txt', 'a') as file:
-                file.write("Conversion fail: " + local_filename_ogg + '\n')
+            download_response = retry(download_and_convert)
+        except (subprocess.CalledProcessError, FileNotFoundError, PermissionError) as e:
+            print(f"Conversion failed ({e}). Logging entry...")
+            logging.info("Conversion fail: %s (%s)", ogg_url, e)
+            return local_filename_mp3, True
+        if download_response is None:
+            sys.exit("Encountered connection error which could not be resolved.")
+        if not download_response.ok:
+            raise DownloadError(download_response.status_code, ogg_url)
+        file_written = True
+    finally:
+        if not file_written:
+            with existing_files_lock:
+                existing_files.discard(mp3_file_basename)
 
     return local_filename_mp3, False
 
+def resolve_ogg_url(file_link):
+    """Fetch a "File:" subpage and find the ogg file it links to
+    :param file_link: Absolute link to the subpage
+    :return: Absolute URL of the ogg file, or None if the page has no such link
+    :raises DownloadError: If the server refuses the page with a non-retryable status
+    """
+    file_page_response = get_file_page_response(file_link)
+    if file_page_response is None:
+        sys.exit("Encountered connection error which could not be resolved.")
+    if not file_page_response.ok:
+        raise DownloadError(file_page_response.status_code, file_link)
+    file_page_soup = BeautifulSoup(file_page_response.content, 'lxml')
+
+    # Check for <audio> tag with a <source> src
+    source_tag = file_page_soup.select_one('audio source[src]:not([src=""])')
+    if source_tag:
+        return requests.compat.urljoin(file_link, source_tag['src'])
+
+    # If no <audio> tag found, search for direct .ogg URL in <a> tags
+    a_tag = file_page_soup.select_one('a[href$=".ogg"]')
+    if a_tag:
+        return requests.compat.urljoin(file_link, a_tag['href'])
+    return None
+
+def process_link(file_link, main_page_url, existing_files, folder='output', metadata_args=None):
+    """Resolve a "File:" subpage to its ogg file, then download, convert and tag it
+    :param file_link: Link to the subpage, relative or absolute
+    :param main_page_url: URL of the main page against which relative links resolve
+    :param existing_files: Set of file names already present or in progress in the output directory
+    :param folder: The output directory to which the file should be downloaded
+    :param metadata_args: ffmpeg arguments for the metadata shared by all tracks
+    :return: Tuple of ogg URL (None if not found or skipped), output file (or subpage link if none), and skip flag
+    """
+    # If the link is relative, make it absolute
+    if not file_link.startswith("http"):
+        file_link = requests.compat.urljoin(main_page_url, file_link)
+
+    try:
+        # Reuse the ogg URL resolved by an earlier run if available,
+        # resolving the subpage again if the cached URL has gone stale
+        with ogg_url_cache_lock:
+            cached_ogg_url = ogg_url_cache.get(file_link)
+        if cached_ogg_url:
+            try:
+                output_file, skip_file = download_and_convert_ogg(cached_ogg_url, existing_files, folder, metadata_args)
+                return cached_ogg_url, output_file, skip_file
+            except DownloadError:
+                with ogg_url_cache_lock:
+                    ogg_url_cache.pop(file_link, None)
+
+        # Fetch the subpage containing the .ogg link, then download and convert it if found
+        ogg_url = resolve_ogg_url(file_link)
+        if not ogg_url:
+            print(f"No .ogg download link found on page {file_link}")
+            return None, file_link, True
+        output_file, skip_file = download_and_convert_ogg(ogg_url, existing_files, folder, metadata_args)
+
+        # Only remember URLs which were actually downloaded
+        if not skip_file:
+            with ogg_url_cache_lock:
+                ogg_url_cache[file_link] = ogg_url
+        return ogg_url, output_file, skip_file
+    except DownloadError as e:
+        # A missing or refused file only affects this item
+        print(f"Download failed ({e.status_code}). Logging entry...")
+        logging.info("Download failed (%s): %s", e.status_code, e.url)
+        return None, file_link, True
+    except (requests.exceptions.RequestException, DecodeError) as e:
+        # Requests which cannot succeed however often they are retried, or a corrupt stream
+        print(f"Download failed ({e}). Logging entry...")
+        logging.info("Download failed: %s (%s)", file_link, e)
+        return None, file_link, True
+
 if __name__ == "__main__":
     if len(sys.argv) > 1:
         # URL of the main page containing links to the individual pages with "File:" links
@@ -120,6 +472,9 @@ if __name__ == "__main__":
         # URL is needed; quit if not supplied
         sys.exit("Requires one input url from which to download .ogg files for conversion.")
 
+    # Record skipped and failed items in the notes file, shared safely by all worker threads
+    logging.basicConfig(filename='output_notes.txt', level=logging.INFO, format='%(asctime)s %(message)s')
+
     # Allow for optional output directory name
     output_directory = (sys.argv[2] if (len(sys.argv) > 2) else 'output')
     album_name = (sys.argv[3] if (len(sys.argv) > 3) else None)
@@ -132,68 +487,50 @@ if __name__ == "__main__":
     print(f"Artist Name: {'[Blank]' if (artist_name is None) else artist_name}")
     print(f"Thumbnail File: {'[Blank]' if (thumbnail_file is None) else thumbnail_file}\n")
 
+    artwork_file = (thumbnail_file if (thumbnail_file and os.path.isfile(thumbnail_file)) else None)
+    if artwork_file and not validate_artwork(artwork_file):
+        # Unusable artwork would otherwise fail the conversion of every track
+        print(f"Thumbnail file {thumbnail_file} cannot be embedded as cover art. Continuing without it.\n")
+        logging.info("Artwork skipped, cannot be embedded: %s", thumbnail_file)
+        artwork_file = None
+
+    # Prepare the metadata shared by every track once for the whole batch
+    metadata_args = build_metadata_args(album_name, artist_name, artwork_file)
+
     # Find all the links that contain "File:" in the href on the target URL page
-    response = requests.get(main_page_url, headers=headers)
-    soup = BeautifulSoup(response.content, 'html.parser')
-    file_links = [a['href'] for a in soup.find_all('a', href=True) if "File:" in a['href'] and '.ogg' in a['href']]
+    response = guarded_get(main_page_url, timeout=REQUEST_TIMEOUT)
+    soup = BeautifulSoup(response.content, 'lxml')
+    # Links to the same file often appear more than once, so keep only the first of each
+    file_links = list(dict.fromkeys(a['href'] for a in soup.select('a[href*="File:"][href*=".ogg"]')))
 
     total_links = len(file_links)
     print(f"Total items found: {total_links}.\n")
 
-    # Loop over each "File:" link to navigate to the subpage and download the actual .ogg file
-    for link_index, file_link in enumerate(file_links, start=1):
-        print(f"Item {link_index} of {total_links}:")
+    ogg_url_cache.update(load_ogg_url_cache())
 
-        # If the link is relative, make it absolute
-        if not file_link.startswith("http"):
-            file_link = requests.compat.urljoin(main_page_url, file_link)
+    # Prepare the output directory once, noting which files it already holds
+    os.makedirs(output_directory, exist_ok=True)
+    existing_files = set(os.listdir(output_directory))
 
-        # Fetch the subpage containing the .ogg link
-        file_page_response = get_file_page_response(file_link)
-        if not file_page_response:
-            sys.exit("Encountered connection error which could not be resolved.")
-        file_page_soup = BeautifulSoup(file_page_response.content, 'html.parser')
-        
-        # Check for <audio> tag with a <source> or <audio> src
-        audio_tag = file_page_soup.find('audio')
-        ogg_url = None
-        if audio_tag:
-            source_tag = audio_tag.find('source')
-            if source_tag and source_tag.get('src'):
-                ogg_url = requests.compat.urljoin(file_link, source_tag['src'])
-        
-        if not ogg_url:
-            # If no <audio> tag found, search for direct .ogg URL in <a> tags or elsewhere
-            for a_tag in file_page_soup.find_all('a', href=True):
-                if a_tag['href'].endswith('.ogg'):
-                    ogg_url = requests.compat.urljoin(file_link, a_tag['href'])
-                    break
-
-        # Proceed to download and convert if downloadable ogg file found
-        # Add metadata if found or given
-        if ogg_url:
-            output_file, skip_file = download_and_convert_ogg(ogg_url, output_directory)
-            output_file_basename = os.path.basename(output_file)
-            if not skip_file:
-                try:
-                    if os.path.isfile(output_file):
-                        file_tag = music_tag.load_file(output_file)
-                        file_tag['title'] = os.path.splitext(output_file_basename)[0]
-                        if album_name:
-                            file_tag['album'] = album_name
-                        if artist_name:
-                            file_tag['artist'] = artist_name
-                        if thumbnail_file:
-                            if os.path.isfile(thumbnail_file):
-                                with open(thumbnail_file, 'rb') as img:
-                                    file_tag['artwork'] = img.read()
-                        file_tag.save()
-                except:
-                    print(f"Could not add metadata to {output_file_basename}.")
-                    with open('output_notes.txt', 'a') as file:
-                        file.write("Failed to write metadata: " + output_file_basename + '\n')
-                print(f"Completed {output_file_basename}.")
-        else:
-            print(f"No .ogg download link found on page {file_link}")
+    # Process each "File:" link concurrently, reporting files as their workers complete
+    completed_links = 0
+    executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    try:
+        futures = {executor.submit(process_link, file_link, main_page_url, existing_files, output_directory, metadata_args): file_link
+                   for file_link in file_links}
+        for future in as_completed(futures):
+            ogg_url, output_file, skip_file = future.result()
+            completed_links += 1
+            if skip_file:
+                print(f"[{completed_links}/{total_links}] Skipped {futures[future]}")
+            else:
+                print(f"[{completed_links}/{total_links}] Completed {os.path.basename(output_file)}")
+    except BaseException:
+        # Don't wait on queued items when exiting early
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    finally:
+        save_ogg_url_cache()
+    executor.shutdown()
 
 # EOF